@@ -30,7 +30,7 @@
         'views/stock_movement_report_wizard_view.xml',
     ],
     'external_dependencies': {
-        'python': ['xlsxwriter'],
+        'python': ['xlsxwriter', 'numpy'],
     },
     'installable': True,
     'application': False,
@@ -12,6 +12,315 @@ try:
 except ImportError:
     xlsxwriter = None
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _reduce_yearly(monthly, year_of_month, n_years):
+    """Sum a (products, months, columns) array into (products, years, columns)"""
+    n_products, n_months, n_columns = monthly.shape
+    yearly = np.zeros((n_products, n_years, n_columns))
+    for product_index in range(n_products):
+        for month_index in range(n_months):
+            year_index = year_of_month[month_index]
+            for column_index in range(n_columns):
+                yearly[product_index, year_index, column_index] += \
+                    monthly[product_index, month_index, column_index]
+    return yearly
+
+
+_reduce_yearly_kernel = None
+
+
+def _get_reduce_yearly_kernel():
+    """
+    Compile _reduce_yearly with numba on first use, or return None if numba is not installed.
+    numba is imported lazily so workers that never build this report don't load numba/llvmlite.
+    The kernel is serial on purpose: Odoo serves requests from several threads, and numba's
+    parallel 'workqueue' threading layer aborts the process when called concurrently.
+    cache=True stores the compiled kernel in __pycache__ (or numba's user-wide cache
+    directory when that is not writable), so it is not recompiled in every worker.
+    """
+    global _reduce_yearly_kernel
+    if _reduce_yearly_kernel is None:
+        try:
+            from numba import njit
+        except ImportError:
+            _reduce_yearly_kernel = False
+        else:
+            _reduce_yearly_kernel = njit(cache=True)(_reduce_yearly)
+    return _reduce_yearly_kernel or None
+
+
+# Column indexes of the monthly data buffer, in report column order
+COL_OPENING = 0
+COL_PURCHASE_QTY = 1
+COL_PURCHASE_VALUE = 2
+COL_SALE_QTY = 3
+COL_SALE_VALUE = 4
+COL_POS_QTY = 5
+COL_POS_VALUE = 6
+COL_CLOSING = 7
+
+# Columns per month: (key, label, format type)
+MONTH_COLUMNS = (
+    ('opening_qty', 'Opening\nStock', 'integer'),
+    ('purchase_qty', 'Purchased\nQty', 'integer'),
+    ('purchase_value', 'Purchase\nValue', 'currency'),
+    ('sale_qty', 'Sold Qty\n(Sales)', 'integer'),
+    ('sale_value', 'Sales\nValue', 'currency'),
+    ('pos_qty', 'Sold Qty\n(POS)', 'integer'),
+    ('pos_value', 'POS\nValue', 'currency'),
+    ('closing_qty', 'Closing\nStock', 'integer'),
+)
+
+# Yearly summary columns: (key, label, format type)
+YEAR_COLUMNS = (
+    ('total_purchase_qty', 'Total\nPurchased', 'integer'),
+    ('total_purchase_value', 'Total\nPurchase Value', 'currency'),
+    ('total_sale_qty', 'Total\nSold (Sales)', 'integer'),
+    ('total_sale_value', 'Total\nSales Value', 'currency'),
+    ('total_pos_qty', 'Total\nSold (POS)', 'integer'),
+    ('total_pos_value', 'Total\nPOS Value', 'currency'),
+)
+
+# Excel cell formats, added to each report workbook
+_FORMAT_DEFS = {
+    # Title format
+    'title': {
+        'bold': True,
+        'font_size': 16,
+        'align': 'center',
+        'valign': 'vcenter',
+        'font_color': '#FFFFFF',
+        'bg_color': '#2E7D32',
+        'border': 1,
+    },
+    # Header level 1 (Month names)
+    'header_month': {
+        'bold': True,
+        'font_size': 12,
+        'align': 'center',
+        'valign': 'vcenter',
+        'font_color': '#FFFFFF',
+        'bg_color': '#1565C0',
+        'border': 1,
+        'text_wrap': True,
+    },
+    # Header level 2 (Column names)
+    'header_col': {
+        'bold': True,
+        'font_size': 10,
+        'align': 'center',
+        'valign': 'vcenter',
+        'font_color': '#FFFFFF',
+        'bg_color': '#42A5F5',
+        'border': 1,
+        'text_wrap': True,
+    },
+    # Product name format
+    'product': {
+        'bold': True,
+        'font_size': 10,
+        'align': 'left',
+        'valign': 'vcenter',
+        'bg_color': '#E3F2FD',
+        'border': 1,
+        'text_wrap': True,
+    },
+    # Number format
+    'number': {
+        'font_size': 10,
+        'align': 'right',
+        'valign': 'vcenter',
+        'num_format': '#,##0.00',
+        'border': 1,
+    },
+    # Currency format
+    'currency': {
+        'font_size': 10,
+        'align': 'right',
+        'valign': 'vcenter',
+        'num_format': 'Rp #,##0.00',
+        'border': 1,
+    },
+    # Integer format
+    'integer': {
+        'font_size': 10,
+        'align': 'right',
+        'valign': 'vcenter',
+        'num_format': '#,##0',
+        'border': 1,
+    },
+    # Yearly total header
+    'header_year': {
+        'bold': True,
+        'font_size': 12,
+        'align': 'center',
+        'valign': 'vcenter',
+        'font_color': '#FFFFFF',
+        'bg_color': '#FF6F00',
+        'border': 1,
+        'text_wrap': True,
+    },
+    # Yearly column header
+    'header_year_col': {
+        'bold': True,
+        'font_size': 10,
+        'align': 'center',
+        'valign': 'vcenter',
+        'font_color': '#FFFFFF',
+        'bg_color': '#FFB300',
+        'border': 1,
+        'text_wrap': True,
+    },
+    # Yearly data format
+    'year_number': {
+        'font_size': 10,
+        'align': 'right',
+        'valign': 'vcenter',
+        'num_format': '#,##0.00',
+        'border': 1,
+        'bg_color': '#FFF3E0',
+    },
+    'year_currency': {
+        'font_size': 10,
+        'align': 'right',
+        'valign': 'vcenter',
+        'num_format': 'Rp #,##0.00',
+        'border': 1,
+        'bg_color': '#FFF3E0',
+    },
+}
+
+# Report queries, run once per report over all products.
+# Date predicates compare the raw column against a half-open range (no ::date
+# cast) so they stay sargable, e.g. for an index like:
+# CREATE INDEX ON stock_move (product_id, date) WHERE state = 'done'
+_STOCK_BASELINE_SQL = """
+    SELECT sm.product_id,
+           COALESCE(SUM(CASE
+                            WHEN sm.location_dest_id = ANY(%s) THEN sm.product_qty
+                            WHEN sm.location_id = ANY(%s) THEN -sm.product_qty
+                            ELSE 0
+                            END), 0) as qty
+    FROM stock_move sm
+    WHERE sm.product_id = ANY(%s)
+      AND sm.state = 'done'
+      AND sm.date < %s
+      AND (sm.location_id = ANY(%s)
+       OR sm.location_dest_id = ANY(%s))
+    GROUP BY sm.product_id
+"""
+
+_STOCK_MATRIX_SQL = """
+    WITH monthly AS (
+        SELECT sm.product_id,
+               date_trunc('month', sm.date) as bucket,
+               SUM(CASE
+                       WHEN sm.location_dest_id = ANY(%s) THEN sm.product_qty
+                       WHEN sm.location_id = ANY(%s) THEN -sm.product_qty
+                       ELSE 0
+                       END) as delta
+        FROM stock_move sm
+        WHERE sm.product_id = ANY(%s)
+          AND sm.state = 'done'
+          AND sm.date >= %s
+          AND sm.date < %s
+          AND (sm.location_id = ANY(%s)
+           OR sm.location_dest_id = ANY(%s))
+        GROUP BY sm.product_id, bucket
+    )
+    SELECT product_id,
+           bucket,
+           COALESCE(SUM(delta) OVER (PARTITION BY product_id ORDER BY bucket
+                                     ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING),
+                    0) as opening,
+           SUM(delta) OVER (PARTITION BY product_id ORDER BY bucket) as closing
+    FROM monthly
+"""
+
+_ACTIVE_PRODUCTS_SQL = """
+    SELECT sm.product_id
+    FROM stock_move sm
+    WHERE sm.product_id = ANY(%s)
+      AND sm.state = 'done'
+      AND sm.date >= %s
+      AND sm.date < %s
+      AND (sm.location_id = ANY(%s)
+       OR sm.location_dest_id = ANY(%s))
+    UNION
+    SELECT pol.product_id
+    FROM purchase_order_line pol
+    JOIN purchase_order po ON pol.order_id = po.id
+    WHERE pol.product_id = ANY(%s)
+      AND po.state IN ('purchase', 'done')
+      AND po.date_approve >= %s
+      AND po.date_approve < %s
+    UNION
+    SELECT sol.product_id
+    FROM sale_order_line sol
+    JOIN sale_order so ON sol.order_id = so.id
+    WHERE sol.product_id = ANY(%s)
+      AND so.state IN ('sale', 'done')
+      AND so.date_order >= %s
+      AND so.date_order < %s
+    UNION
+    SELECT pol.product_id
+    FROM pos_order_line pol
+    JOIN pos_order po ON pol.order_id = po.id
+    WHERE pol.product_id = ANY(%s)
+      AND po.state IN ('paid', 'done', 'invoiced')
+      AND po.date_order >= %s
+      AND po.date_order < %s
+"""
+
+_PURCHASE_MATRIX_SQL = """
+    SELECT pol.product_id,
+           date_trunc('month', po.date_approve) as bucket,
+           COALESCE(SUM(pol.qty_received / pol_uom.factor), 0) as qty,
+           COALESCE(SUM(pol.qty_received * pol.price_unit), 0) as value
+    FROM purchase_order_line pol
+    JOIN purchase_order po ON pol.order_id = po.id
+    JOIN uom_uom pol_uom ON pol.product_uom_id = pol_uom.id
+    WHERE pol.product_id = ANY(%s)
+      AND po.state IN ('purchase', 'done')
+      AND po.date_approve >= %s
+      AND po.date_approve < %s
+    GROUP BY pol.product_id, bucket
+"""
+
+_SALE_MATRIX_SQL = """
+    SELECT sol.product_id,
+           date_trunc('month', so.date_order) as bucket,
+           COALESCE(SUM(sol.qty_delivered / sol_uom.factor), 0) as qty,
+           COALESCE(SUM(sol.qty_delivered * sol.price_unit), 0) as value
+    FROM sale_order_line sol
+    JOIN sale_order so ON sol.order_id = so.id
+    JOIN uom_uom sol_uom ON sol.product_uom_id = sol_uom.id
+    WHERE sol.product_id = ANY(%s)
+      AND so.state IN ('sale', 'done')
+      AND so.date_order >= %s
+      AND so.date_order < %s
+    GROUP BY sol.product_id, bucket
+"""
+
+_POS_MATRIX_SQL = """
+    SELECT pol.product_id,
+           date_trunc('month', po.date_order) as bucket,
+           COALESCE(SUM(pol.qty), 0) as qty,
+           COALESCE(SUM(pol.price_subtotal_incl), 0) as value
+    FROM pos_order_line pol
+    JOIN pos_order po ON pol.order_id = po.id
+    WHERE pol.product_id = ANY(%s)
+      AND po.state IN ('paid', 'done', 'invoiced')
+      AND po.date_order >= %s
+      AND po.date_order < %s
+    GROUP BY pol.product_id, bucket
+"""
+
 
 class StockMovementReportWizard(models.TransientModel):
     _name = 'stock.movement.report.wizard'
@@ -84,7 +393,12 @@ class StockMovementReportWizard(models.TransientModel):
 
     def _get_products(self):
         """Get product variants to include in report, excluding phantom BoM (kit) products"""
-        domain = [('type', '=', 'consu')]
+        # Exclude products that have phantom BoM (kits) to avoid double counting
+        # Kit products' stock movements are already reflected in their components
+        domain = [
+            ('type', '=', 'consu'),
+            ('product_tmpl_id.bom_ids', 'not any', [('type', '=', 'phantom')]),
+        ]
 
         if self.product_ids:
             domain.append(('id', 'in', self.product_ids.ids))
@@ -92,38 +406,37 @@ class StockMovementReportWizard(models.TransientModel):
         if self.category_ids:
             domain.append(('categ_id', 'child_of', self.category_ids.ids))
 
-        products = self.env['product.product'].search(domain, order='name')
+        return self.env['product.product'].search(domain, order='name')
 
-        # Exclude products that have phantom BoM (kits) to avoid double counting
-        # Kit products' stock movements are already reflected in their components
-        if products:
-            phantom_bom_product_tmpl_ids = self.env['mrp.bom'].search([
-                ('type', '=', 'phantom'),
-                ('product_tmpl_id', 'in', products.product_tmpl_id.ids)
-            ]).mapped('product_tmpl_id').ids
-
-            if phantom_bom_product_tmpl_ids:
-                products = products.filtered(
-                    lambda p: p.product_tmpl_id.id not in phantom_bom_product_tmpl_ids
-                )
-
-        return products
-
-    def _get_product_display_name(self, product):
-        """Get product name with all variant attributes in one cell"""
-        name = product.product_tmpl_id.name
-
-        if product.product_template_attribute_value_ids:
-            attributes = []
-            for attr_value in product.product_template_attribute_value_ids:
-                attr_name = attr_value.attribute_id.name
-                value_name = attr_value.name
-                attributes.append(f"{attr_name}: {value_name}")
+    def _build_display_names(self, products):
+        """
+        Get product names with all variant attributes in one cell, for all products at once.
+        Returns a dict: {product_id: display_name}
+        """
+        product_data = products.read(['product_tmpl_id', 'product_template_attribute_value_ids'], load=None)
 
+        template_names = {
+            template['id']: template['name']
+            for template in self.env['product.template'].browse(
+                {product['product_tmpl_id'] for product in product_data}
+            ).read(['name'])
+        }
+        attribute_labels = {
+            attr_value['id']: f"{attr_value['attribute_id'][1]}: {attr_value['name']}"
+            for attr_value in self.env['product.template.attribute.value'].browse(
+                {value_id for product in product_data for value_id in product['product_template_attribute_value_ids']}
+            ).read(['attribute_id', 'name'])
+        }
+
+        display_names = {}
+        for product in product_data:
+            name = template_names[product['product_tmpl_id']]
+            attributes = [attribute_labels[value_id] for value_id in product['product_template_attribute_value_ids']]
             if attributes:
                 name = f"{name} ({', '.join(attributes)})"
+            display_names[product['id']] = name
 
-        return name
+        return display_names
 
     def _get_location_ids(self):
         """Get internal location IDs for stock calculation"""
@@ -138,277 +451,226 @@ class StockMovementReportWizard(models.TransientModel):
             ])
         return locations.ids
 
-    def _get_stock_at_date(self, product_id, date, location_ids):
-        """Calculate stock quantity at a specific date using product_qty (already in product's base UoM)"""
-        self.env.cr.execute("""
-                            SELECT COALESCE(SUM(
-                                                    CASE
-                                                        WHEN sm.location_dest_id IN %s THEN sm.product_qty
-                                                        WHEN sm.location_id IN %s THEN -sm.product_qty
-                                                        ELSE 0
-                                                        END
-                                            ), 0) as qty
-                            FROM stock_move sm
-                            WHERE sm.product_id = %s
-                              AND sm.state = 'done'
-                              AND sm.date::date <= %s
-                              AND (sm.location_id IN %s
-                               OR sm.location_dest_id IN %s)
-                            """, (
-                                tuple(location_ids), tuple(location_ids),
-                                product_id, date,
-                                tuple(location_ids), tuple(location_ids)
-                            ))
-        result = self.env.cr.fetchone()
-        return result[0] if result else 0
-
-    def _get_stock_moves_data(self, product_id, date_start, date_end, location_ids):
-        """Get stock move data for a product in a date range"""
-        data = {
-            'qty_in': 0,
-            'qty_out': 0,
-            'value_in': 0,
-            'value_out': 0,
-            'purchase_qty': 0,
-            'purchase_value': 0,
-            'sale_qty': 0,
-            'sale_value': 0,
-            'pos_qty': 0,
-            'pos_value': 0,
+    def _fetch_stock_baseline(self, product_ids, date, location_ids):
+        """
+        Calculate stock quantity of all products before a specific date using
+        product_qty (already in product's base UoM).
+        Returns a dict: {product_id: qty}
+        """
+        self.env.cr.execute(_STOCK_BASELINE_SQL, (
+            location_ids, location_ids,
+            list(product_ids), date,
+            location_ids, location_ids
+        ))
+        return dict(self.env.cr.fetchall())
+
+    def _fetch_stock_matrix(self, product_ids, date_from, date_to, location_ids):
+        """
+        Calculate the running stock quantity of all products per month, relative to
+        the stock before date_from (see _fetch_stock_baseline).
+        Months without any stock move are absent, their stock is the previous closing.
+        Returns a dict: {(product_id, year, month): (opening_qty, closing_qty)}
+        """
+        self.env.cr.execute(_STOCK_MATRIX_SQL, (
+            location_ids, location_ids,
+            list(product_ids), date_from, date_to + timedelta(days=1),
+            location_ids, location_ids
+        ))
+
+        return {
+            (product_id, bucket.year, bucket.month): (opening or 0, closing or 0)
+            for product_id, bucket, opening, closing in self.env.cr.fetchall()
         }
 
-        # Find phantom BoMs that contain this product as a component
-        phantom_bom_data = self._get_phantom_bom_components(product_id)
-
-        # Get incoming moves using product_qty (already in product's base UoM)
-        self.env.cr.execute("""
-                            SELECT COALESCE(SUM(sm.product_qty), 0) as qty,
-                                   COALESCE(SUM(sm.product_qty * COALESCE(
-                                           (SELECT pol.price_unit
-                                            FROM purchase_order_line pol
-                                                     JOIN stock_move sm2 ON sm2.purchase_line_id = pol.id
-                                            WHERE sm2.id = sm.id LIMIT 1),
-                                           sm.price_unit
-                                   )), 0) as value
-                            FROM stock_move sm
-                            WHERE sm.product_id = %s
-                              AND sm.state = 'done'
-                              AND sm.date:: date >= %s
-                              AND sm.date:: date <= %s
-                              AND sm.location_dest_id IN %s
-                              AND sm.location_id NOT IN %s
-                            """, (product_id, date_start, date_end, tuple(location_ids), tuple(location_ids)))
-
-        result = self.env.cr.fetchone()
-        if result:
-            data['qty_in'] = result[0] or 0
-            data['value_in'] = result[1] or 0
-
-        # Get outgoing moves using product_qty (already in product's base UoM)
-        self.env.cr.execute("""
-                            SELECT COALESCE(SUM(sm.product_qty), 0) as qty,
-                                   COALESCE(SUM(sm.product_qty * sm.price_unit), 0) as value
-                            FROM stock_move sm
-                            WHERE sm.product_id = %s
-                              AND sm.state = 'done'
-                              AND sm.date:: date >= %s
-                              AND sm.date:: date <= %s
-                              AND sm.location_id IN %s
-                              AND sm.location_dest_id NOT IN %s
-                            """, (product_id, date_start, date_end, tuple(location_ids), tuple(location_ids)))
-
-        result = self.env.cr.fetchone()
-        if result:
-            data['qty_out'] = result[0] or 0
-            data['value_out'] = result[1] or 0
-
-        # Get purchase-specific data with UoM conversion
-        if self.include_purchases:
-            self.env.cr.execute("""
-                                SELECT COALESCE(SUM(pol.qty_received / pol_uom.factor * prod_uom.factor), 0) as qty,
-                                       COALESCE(SUM(pol.qty_received * pol.price_unit), 0) as value
-                                FROM purchase_order_line pol
-                                    JOIN purchase_order po
-                                ON pol.order_id = po.id
-                                    JOIN product_product pp ON pol.product_id = pp.id
-                                    JOIN product_template pt ON pp.product_tmpl_id = pt.id
-                                    JOIN uom_uom prod_uom ON pt.uom_id = prod_uom.id
-                                    JOIN uom_uom pol_uom ON pol.product_uom_id = pol_uom.id
-                                WHERE pol.product_id = %s
-                                  AND po.state IN ('purchase'
-                                    , 'done')
-                                  AND po.date_approve:: date >= %s
-                                  AND po.date_approve:: date <= %s
-                                """, (product_id, date_start, date_end))
-
-            result = self.env.cr.fetchone()
-            if result:
-                data['purchase_qty'] = result[0] or 0
-                data['purchase_value'] = result[1] or 0
-
-        # Add purchases from phantom BoM (kit) products
-        for kit_product_id, bom_qty in phantom_bom_data.items():
-            self.env.cr.execute("""
-                                SELECT COALESCE(SUM(pol.qty_received / pol_uom.factor * prod_uom.factor), 0) as qty,
-                                       COALESCE(SUM(pol.qty_received * pol.price_unit), 0) as value
-                                FROM purchase_order_line pol
-                                JOIN purchase_order po ON pol.order_id = po.id
-                                JOIN product_product pp ON pol.product_id = pp.id
-                                JOIN product_template pt ON pp.product_tmpl_id = pt.id
-                                JOIN uom_uom prod_uom ON pt.uom_id = prod_uom.id
-                                JOIN uom_uom pol_uom ON pol.product_uom_id = pol_uom.id
-                                WHERE pol.product_id = %s
-                                  AND po.state IN ('purchase', 'done')
-                                  AND po.date_approve::date >= %s
-                                  AND po.date_approve::date <= %s
-                                """, (kit_product_id, date_start, date_end))
-
-            result = self.env.cr.fetchone()
-            if result and result[0]:
+    def _get_active_product_ids(self, product_ids, date_from, date_to, location_ids, kit_components):
+        """
+        Find the products with any stock move, purchase, sale or POS activity in a date
+        range, either directly or through a phantom BoM (kit) product containing them.
+        Returns a set of product ids.
+        """
+        product_ids = list(product_ids)
+        kit_product_ids = list(kit_components)
+        date_end = date_to + timedelta(days=1)
+
+        self.env.cr.execute(_ACTIVE_PRODUCTS_SQL, (
+            product_ids, date_from, date_end,
+            location_ids, location_ids,
+            (product_ids if self.include_purchases else []) + kit_product_ids, date_from, date_end,
+            product_ids + kit_product_ids if self.include_sales else [], date_from, date_end,
+            product_ids + kit_product_ids if self.include_pos else [], date_from, date_end,
+        ))
+        touched_product_ids = {row[0] for row in self.env.cr.fetchall()}
+
+        active_product_ids = touched_product_ids & set(product_ids)
+        for kit_product_id in touched_product_ids & set(kit_product_ids):
+            active_product_ids.update(component_id for component_id, bom_qty in kit_components[kit_product_id])
+        return active_product_ids
+
+    def _get_kit_components(self, phantom_bom_map):
+        """
+        Invert a {component_product_id: {kit_product_id: qty}} mapping.
+        Returns a dict: {kit_product_id: [(component_product_id, qty), ...]}
+        """
+        kit_components = {}
+        for component_id, kits in phantom_bom_map.items():
+            for kit_product_id, bom_qty in kits.items():
+                kit_components.setdefault(kit_product_id, []).append((component_id, bom_qty))
+        return kit_components
+
+    def _add_order_line_rows(self, monthly, product_indexes, month_indexes, rows,
+                             direct_product_ids, kit_components, qty_col, value_col):
+        """
+        Add (product_id, bucket, qty, value) rows into the monthly data buffer.
+        Direct rows are added as-is, kit rows are multiplied by the BoM quantity
+        of each of their components.
+        """
+        for line_product_id, bucket, qty, value in rows:
+            month_index = month_indexes[(bucket.year, bucket.month)]
+            qty = qty or 0
+            value = value or 0
+
+            if line_product_id in direct_product_ids:
+                product_index = product_indexes[line_product_id]
+                monthly[product_index, month_index, qty_col] += qty
+                monthly[product_index, month_index, value_col] += value
+
+            if qty:
                 # Multiply by BoM quantity to get component quantity
-                data['purchase_qty'] += (result[0] or 0) * bom_qty
-                data['purchase_value'] += (result[1] or 0) * bom_qty
-
-        # Get sales order data with UoM conversion
-        if self.include_sales:
-            # Direct sales of the product
-            self.env.cr.execute("""
-                                SELECT COALESCE(SUM(sol.qty_delivered / sol_uom.factor * prod_uom.factor), 0) as qty,
-                                       COALESCE(SUM(sol.qty_delivered * sol.price_unit), 0) as value
-                                FROM sale_order_line sol
-                                    JOIN sale_order so
-                                ON sol.order_id = so.id
-                                    JOIN product_product pp ON sol.product_id = pp.id
-                                    JOIN product_template pt ON pp.product_tmpl_id = pt.id
-                                    JOIN uom_uom prod_uom ON pt.uom_id = prod_uom.id
-                                    JOIN uom_uom sol_uom ON sol.product_uom_id = sol_uom.id
-                                WHERE sol.product_id = %s
-                                  AND so.state IN ('sale'
-                                    , 'done')
-                                  AND so.date_order:: date >= %s
-                                  AND so.date_order:: date <= %s
-                                """, (product_id, date_start, date_end))
-
-            result = self.env.cr.fetchone()
-            if result:
-                data['sale_qty'] = result[0] or 0
-                data['sale_value'] = result[1] or 0
-
-            # Add sales from phantom BoM (kit) products
-            for kit_product_id, bom_qty in phantom_bom_data.items():
-                self.env.cr.execute("""
-                                    SELECT COALESCE(SUM(sol.qty_delivered / sol_uom.factor * prod_uom.factor),
-                                                    0) as qty,
-                                           COALESCE(SUM(sol.qty_delivered * sol.price_unit), 0) as value
-                                    FROM sale_order_line sol
-                                        JOIN sale_order so
-                                    ON sol.order_id = so.id
-                                        JOIN product_product pp ON sol.product_id = pp.id
-                                        JOIN product_template pt ON pp.product_tmpl_id = pt.id
-                                        JOIN uom_uom prod_uom ON pt.uom_id = prod_uom.id
-                                        JOIN uom_uom sol_uom ON sol.product_uom_id = sol_uom.id
-                                    WHERE sol.product_id = %s
-                                      AND so.state IN ('sale'
-                                        , 'done')
-                                      AND so.date_order:: date >= %s
-                                      AND so.date_order:: date <= %s
-                                    """, (kit_product_id, date_start, date_end))
-
-                result = self.env.cr.fetchone()
-                if result and result[0]:
-                    data['sale_qty'] += (result[0] or 0) * bom_qty
-                    data['sale_value'] += (result[1] or 0) * bom_qty
-
-        # Get POS sales data (POS uses product's default UoM)
-        if self.include_pos:
-            # Direct POS sales of the product
-            self.env.cr.execute("""
-                                SELECT COALESCE(SUM(pol.qty), 0) as qty,
-                                       COALESCE(SUM(pol.price_subtotal_incl), 0) as value
-                                FROM pos_order_line pol
-                                    JOIN pos_order po
-                                ON pol.order_id = po.id
-                                WHERE pol.product_id = %s
-                                  AND po.state IN ('paid'
-                                    , 'done'
-                                    , 'invoiced')
-                                  AND po.date_order:: date >= %s
-                                  AND po.date_order:: date <= %s
-                                """, (product_id, date_start, date_end))
-
-            result = self.env.cr.fetchone()
-            if result:
-                data['pos_qty'] = result[0] or 0
-                data['pos_value'] = result[1] or 0
-
-            # Add POS sales from phantom BoM (kit) products
-            for kit_product_id, bom_qty in phantom_bom_data.items():
-                self.env.cr.execute("""
-                                    SELECT COALESCE(SUM(pol.qty), 0) as qty,
-                                           COALESCE(SUM(pol.price_subtotal_incl), 0) as value
-                                    FROM pos_order_line pol
-                                        JOIN pos_order po
-                                    ON pol.order_id = po.id
-                                    WHERE pol.product_id = %s
-                                      AND po.state IN ('paid'
-                                        , 'done'
-                                        , 'invoiced')
-                                      AND po.date_order:: date >= %s
-                                      AND po.date_order:: date <= %s
-                                    """, (kit_product_id, date_start, date_end))
-
-                result = self.env.cr.fetchone()
-                if result and result[0]:
-                    data['pos_qty'] += (result[0] or 0) * bom_qty
-                    data['pos_value'] += (result[1] or 0) * bom_qty
-
-        return data
-
-    def _get_phantom_bom_components(self, product_id):
+                for component_id, bom_qty in kit_components.get(line_product_id, []):
+                    product_index = product_indexes[component_id]
+                    monthly[product_index, month_index, qty_col] += qty * bom_qty
+                    monthly[product_index, month_index, value_col] += value * bom_qty
+
+    def _add_purchase_data(self, monthly, product_indexes, month_indexes,
+                           product_ids, date_from, date_to, kit_components, uom_factors):
+        """
+        Add purchase data with UoM conversion for all products in a date range into the
+        monthly data buffer, including purchases of phantom BoM (kit) products containing them.
+        Quantities are converted to the reference UoM in SQL, then to the product's
+        UoM using uom_factors ({product_id: uom factor}).
+        """
+        direct_product_ids = set(product_ids) if self.include_purchases else set()
+        line_product_ids = list(direct_product_ids | set(kit_components))
+        if not line_product_ids:
+            return
+
+        self.env.cr.execute(_PURCHASE_MATRIX_SQL, (line_product_ids, date_from, date_to + timedelta(days=1)))
+
+        rows = [
+            (product_id, bucket, (qty or 0) * uom_factors[product_id], value)
+            for product_id, bucket, qty, value in self.env.cr.fetchall()
+        ]
+        self._add_order_line_rows(
+            monthly, product_indexes, month_indexes, rows,
+            direct_product_ids, kit_components, COL_PURCHASE_QTY, COL_PURCHASE_VALUE
+        )
+
+    def _add_sale_data(self, monthly, product_indexes, month_indexes,
+                       product_ids, date_from, date_to, kit_components, uom_factors):
         """
-        Find all phantom BoM products that contain this product as a component.
-        Returns a dict: {kit_product_id: quantity_of_component_in_kit}
+        Add sales order data with UoM conversion for all products in a date range into the
+        monthly data buffer, including sales of phantom BoM (kit) products containing them.
+        Quantities are converted to the reference UoM in SQL, then to the product's
+        UoM using uom_factors ({product_id: uom factor}).
+        """
+        if not self.include_sales:
+            return
+
+        self.env.cr.execute(_SALE_MATRIX_SQL, (
+            list(set(product_ids) | set(kit_components)),
+            date_from, date_to + timedelta(days=1)
+        ))
+
+        rows = [
+            (product_id, bucket, (qty or 0) * uom_factors[product_id], value)
+            for product_id, bucket, qty, value in self.env.cr.fetchall()
+        ]
+        self._add_order_line_rows(
+            monthly, product_indexes, month_indexes, rows,
+            set(product_ids), kit_components, COL_SALE_QTY, COL_SALE_VALUE
+        )
+
+    def _add_pos_data(self, monthly, product_indexes, month_indexes,
+                      product_ids, date_from, date_to, kit_components):
+        """
+        Add POS sales data (POS uses product's default UoM) for all products in a date
+        range into the monthly data buffer, including POS sales of phantom BoM (kit)
+        products containing them.
+        """
+        if not self.include_pos:
+            return
+
+        self.env.cr.execute(_POS_MATRIX_SQL, (
+            list(set(product_ids) | set(kit_components)),
+            date_from, date_to + timedelta(days=1)
+        ))
+
+        self._add_order_line_rows(
+            monthly, product_indexes, month_indexes, self.env.cr.fetchall(),
+            set(product_ids), kit_components, COL_POS_QTY, COL_POS_VALUE
+        )
+
+    def _build_phantom_bom_map(self, products):
+        """
+        Find all phantom BoM (kit) products that contain the given products as a component.
+        Returns a dict: {component_product_id: {kit_product_id: quantity_of_component_in_kit}}
         """
         result = {}
 
-        # Find BoM lines where this product is a component
-        bom_lines = self.env['mrp.bom.line'].search([
-            ('product_id', '=', product_id)
-        ])
+        # Find phantom (kit) BoM lines where one of the products is a component
+        bom_lines = self.env['mrp.bom.line'].search_read([
+            ('product_id', 'in', products.ids),
+            ('bom_id.type', '=', 'phantom'),
+        ], ['product_id', 'bom_id', 'product_qty', 'product_uom_id'], load=None)
+        if not bom_lines:
+            return result
+
+        boms = {
+            bom['id']: bom
+            for bom in self.env['mrp.bom'].browse({line['bom_id'] for line in bom_lines}).read(
+                ['product_id', 'product_tmpl_id'], load=None
+            )
+        }
+
+        # BoM for a template applies to all its variants
+        template_variant_ids = {}
+        template_ids = [bom['product_tmpl_id'] for bom in boms.values() if not bom['product_id']]
+        if template_ids:
+            variants = self.env['product.product'].search_read(
+                [('product_tmpl_id', 'in', template_ids)], ['product_tmpl_id'], load=None
+            )
+            for variant in variants:
+                template_variant_ids.setdefault(variant['product_tmpl_id'], []).append(variant['id'])
+
+        # Convert to product UoM if different, computing one ratio per (from, to) UoM pair
+        product_uom_ids = {product.id: product.uom_id.id for product in products}
+        uom_pairs = {
+            (line['product_uom_id'], product_uom_ids[line['product_id']])
+            for line in bom_lines
+        }
+        Uom = self.env['uom.uom']
+        uom_ratios = {
+            (from_uom_id, to_uom_id): Uom.browse(from_uom_id)._compute_quantity(
+                1.0, Uom.browse(to_uom_id), round=False
+            )
+            for from_uom_id, to_uom_id in uom_pairs
+            if from_uom_id != to_uom_id
+        }
 
         for line in bom_lines:
-            bom = line.bom_id
-            # Only consider phantom (kit) BoMs
-            if bom.type == 'phantom':
-                # Get the kit product(s)
-                if bom.product_id:
-                    # BoM is for a specific variant
-                    kit_product_id = bom.product_id.id
-                else:
-                    # BoM is for template, get all variants
-                    kit_products = bom.product_tmpl_id.product_variant_ids
-                    for kit_product in kit_products:
-                        kit_product_id = kit_product.id
-                        # Calculate the quantity considering UoM
-                        component_qty = line.product_qty
-                        # Convert to product UoM if different
-                        if line.product_uom_id != line.product_id.uom_id:
-                            component_qty = line.product_uom_id._compute_quantity(
-                                line.product_qty,
-                                line.product_id.uom_id
-                            )
-                        result[kit_product_id] = component_qty
-                    continue
-
-                # Calculate the quantity considering UoM
-                component_qty = line.product_qty
-                # Convert to product UoM if different
-                if line.product_uom_id != line.product_id.uom_id:
-                    component_qty = line.product_uom_id._compute_quantity(
-                        line.product_qty,
-                        line.product_id.uom_id
-                    )
-                result[kit_product_id] = component_qty
+            component_id = line['product_id']
+            uom_pair = (line['product_uom_id'], product_uom_ids[component_id])
+            component_qty = line['product_qty'] * uom_ratios.get(uom_pair, 1.0)
+
+            bom = boms[line['bom_id']]
+            if bom['product_id']:
+                # BoM is for a specific variant
+                kit_product_ids = [bom['product_id']]
+            else:
+                kit_product_ids = template_variant_ids.get(bom['product_tmpl_id'], [])
+
+            for kit_product_id in kit_product_ids:
+                result.setdefault(component_id, {})[kit_product_id] = component_qty
 
         return result
 
@@ -419,6 +681,9 @@ class StockMovementReportWizard(models.TransientModel):
         if not xlsxwriter:
             raise UserError(_('xlsxwriter library is required. Please install it using: pip install xlsxwriter'))
 
+        if not np:
+            raise UserError(_('numpy library is required. Please install it using: pip install numpy'))
+
         products = self._get_products()
         if not products:
             raise UserError(_('No products found with the given criteria.'))
@@ -431,9 +696,15 @@ class StockMovementReportWizard(models.TransientModel):
         if not location_ids:
             raise UserError(_('No stock locations found.'))
 
+        phantom_bom_map = self._build_phantom_bom_map(products)
+        display_names = self._build_display_names(products)
+
         # Create Excel file
         output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output, {'in_memory': True})
+        # constant_memory streams rows to disk as they are completed instead of keeping
+        # the whole sheet in memory ('in_memory' would override it), so all rows must be
+        # written in order
+        workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
 
         # Define formats
         formats = self._create_excel_formats(workbook)
@@ -443,7 +714,8 @@ class StockMovementReportWizard(models.TransientModel):
 
         # Write headers and data
         self._write_excel_content(
-            worksheet, formats, products, months, location_ids
+            worksheet, formats, products, months, location_ids,
+            phantom_bom_map, display_names
         )
 
         workbook.close()
@@ -466,161 +738,31 @@ class StockMovementReportWizard(models.TransientModel):
 
     def _create_excel_formats(self, workbook):
         """Create Excel cell formats"""
-        formats = {}
-
-        # Title format
-        formats['title'] = workbook.add_format({
-            'bold': True,
-            'font_size': 16,
-            'align': 'center',
-            'valign': 'vcenter',
-            'font_color': '#FFFFFF',
-            'bg_color': '#2E7D32',
-            'border': 1,
-        })
-
-        # Header level 1 (Month names)
-        formats['header_month'] = workbook.add_format({
-            'bold': True,
-            'font_size': 12,
-            'align': 'center',
-            'valign': 'vcenter',
-            'font_color': '#FFFFFF',
-            'bg_color': '#1565C0',
-            'border': 1,
-            'text_wrap': True,
-        })
-
-        # Header level 2 (Column names)
-        formats['header_col'] = workbook.add_format({
-            'bold': True,
-            'font_size': 10,
-            'align': 'center',
-            'valign': 'vcenter',
-            'font_color': '#FFFFFF',
-            'bg_color': '#42A5F5',
-            'border': 1,
-            'text_wrap': True,
-        })
-
-        # Product name format
-        formats['product'] = workbook.add_format({
-            'bold': True,
-            'font_size': 10,
-            'align': 'left',
-            'valign': 'vcenter',
-            'bg_color': '#E3F2FD',
-            'border': 1,
-            'text_wrap': True,
-        })
-
-        # Number format
-        formats['number'] = workbook.add_format({
-            'font_size': 10,
-            'align': 'right',
-            'valign': 'vcenter',
-            'num_format': '#,##0.00',
-            'border': 1,
-        })
-
-        # Currency format
-        formats['currency'] = workbook.add_format({
-            'font_size': 10,
-            'align': 'right',
-            'valign': 'vcenter',
-            'num_format': 'Rp #,##0.00',
-            'border': 1,
-        })
-
-        # Integer format
-        formats['integer'] = workbook.add_format({
-            'font_size': 10,
-            'align': 'right',
-            'valign': 'vcenter',
-            'num_format': '#,##0',
-            'border': 1,
-        })
-
-        # Yearly total header
-        formats['header_year'] = workbook.add_format({
-            'bold': True,
-            'font_size': 12,
-            'align': 'center',
-            'valign': 'vcenter',
-            'font_color': '#FFFFFF',
-            'bg_color': '#FF6F00',
-            'border': 1,
-            'text_wrap': True,
-        })
-
-        # Yearly column header
-        formats['header_year_col'] = workbook.add_format({
-            'bold': True,
-            'font_size': 10,
-            'align': 'center',
-            'valign': 'vcenter',
-            'font_color': '#FFFFFF',
-            'bg_color': '#FFB300',
-            'border': 1,
-            'text_wrap': True,
-        })
-
-        # Yearly data format
-        formats['year_number'] = workbook.add_format({
-            'font_size': 10,
-            'align': 'right',
-            'valign': 'vcenter',
-            'num_format': '#,##0.00',
-            'border': 1,
-            'bg_color': '#FFF3E0',
-        })
-
-        formats['year_currency'] = workbook.add_format({
-            'font_size': 10,
-            'align': 'right',
-            'valign': 'vcenter',
-            'num_format': 'Rp #,##0.00',
-            'border': 1,
-            'bg_color': '#FFF3E0',
-        })
-
-        return formats
+        return {key: workbook.add_format(spec) for key, spec in _FORMAT_DEFS.items()}
 
-    def _write_excel_content(self, worksheet, formats, products, months, location_ids):
+    def _write_excel_content(self, worksheet, formats, products, months, location_ids,
+                             phantom_bom_map, display_names):
         """Write content to Excel worksheet"""
 
-        # Define columns per month
-        month_columns = [
-            ('opening_qty', 'Opening\nStock', 'integer'),
-            ('purchase_qty', 'Purchased\nQty', 'integer'),
-            ('purchase_value', 'Purchase\nValue', 'currency'),
-            ('sale_qty', 'Sold Qty\n(Sales)', 'integer'),
-            ('sale_value', 'Sales\nValue', 'currency'),
-            ('pos_qty', 'Sold Qty\n(POS)', 'integer'),
-            ('pos_value', 'POS\nValue', 'currency'),
-            ('closing_qty', 'Closing\nStock', 'integer'),
-        ]
-
-        cols_per_month = len(month_columns)
-
-        # Yearly summary columns
-        year_columns = [
-            ('total_purchase_qty', 'Total\nPurchased', 'integer'),
-            ('total_purchase_value', 'Total\nPurchase Value', 'currency'),
-            ('total_sale_qty', 'Total\nSold (Sales)', 'integer'),
-            ('total_sale_value', 'Total\nSales Value', 'currency'),
-            ('total_pos_qty', 'Total\nSold (POS)', 'integer'),
-            ('total_pos_value', 'Total\nPOS Value', 'currency'),
-        ]
+        cols_per_month = len(MONTH_COLUMNS)
 
         # Group months by year
         years_in_range = sorted(set(m['year'] for m in months))
 
         # Calculate total columns needed
         total_month_cols = len(months) * cols_per_month
-        total_year_cols = len(years_in_range) * len(year_columns)
+        total_year_cols = len(years_in_range) * len(YEAR_COLUMNS)
         total_cols = 1 + total_month_cols + total_year_cols  # 1 for product column
 
+        # Set column widths
+        worksheet.set_column(0, 0, 45)  # Product column
+        worksheet.set_column(1, total_cols - 1, 12)  # Data columns
+
+        # Set row heights (before writing them, rows are flushed in constant_memory mode)
+        worksheet.set_row(0, 30)  # Title row
+        worksheet.set_row(1, 25)  # Month header row
+        worksheet.set_row(2, 40)  # Column header row
+
         # Row 0: Title
         worksheet.merge_range(
             0, 0, 0, total_cols - 1,
@@ -633,7 +775,6 @@ class StockMovementReportWizard(models.TransientModel):
         col = 1  # Start after product column
 
         worksheet.write(row, 0, 'Product', formats['header_month'])
-        worksheet.write(row + 1, 0, 'Variant', formats['header_col'])
 
         for month in months:
             end_col = col + cols_per_month - 1
@@ -642,7 +783,7 @@ class StockMovementReportWizard(models.TransientModel):
 
         # Year summary headers
         for year in years_in_range:
-            end_col = col + len(year_columns) - 1
+            end_col = col + len(YEAR_COLUMNS) - 1
             worksheet.merge_range(row, col, row, end_col, f'Year {year} Total', formats['header_year'])
             col = end_col + 1
 
@@ -650,109 +791,126 @@ class StockMovementReportWizard(models.TransientModel):
         row = 2
         col = 1
 
+        worksheet.write(row, 0, 'Variant', formats['header_col'])
+
         for month in months:
-            for col_def in month_columns:
+            for col_def in MONTH_COLUMNS:
                 worksheet.write(row, col, col_def[1], formats['header_col'])
                 col += 1
 
         for year in years_in_range:
-            for col_def in year_columns:
+            for col_def in YEAR_COLUMNS:
                 worksheet.write(row, col, col_def[1], formats['header_year_col'])
                 col += 1
 
-        # Set column widths
-        worksheet.set_column(0, 0, 45)  # Product column
-        worksheet.set_column(1, total_cols - 1, 12)  # Data columns
+        # Fetch movement data for all products and months at once
+        product_ids = products.ids
+        date_from = months[0]['start']
+        date_to = months[-1]['end']
+        kit_components = self._get_kit_components(phantom_bom_map)
+        stock_baseline = self._fetch_stock_baseline(product_ids, date_from, location_ids)
+
+        # Only products with activity in the date range need the monthly aggregations,
+        # the stock of the others stays at its baseline for every month
+        active_product_ids = self._get_active_product_ids(
+            product_ids, date_from, date_to, location_ids, kit_components
+        )
+        active_ids = [product_id for product_id in product_ids if product_id in active_product_ids]
+        active_kit_components = {
+            kit_product_id: components
+            for kit_product_id, components in kit_components.items()
+            if any(component_id in active_product_ids for component_id, bom_qty in components)
+        }
 
-        # Set row heights
-        worksheet.set_row(0, 30)  # Title row
-        worksheet.set_row(1, 25)  # Month header row
-        worksheet.set_row(2, 40)  # Column header row
+        # Stage monthly data into a (products, months, MONTH_COLUMNS) buffer
+        product_indexes = {product_id: index for index, product_id in enumerate(product_ids)}
+        month_indexes = {(month['year'], month['month']): index for index, month in enumerate(months)}
+        monthly = np.zeros((len(products), len(months), cols_per_month), dtype=np.float64)
+
+        stock_matrix = {}
+        if active_ids:
+            uom_factors = {
+                product.id: product.uom_id.factor
+                for product in self.env['product.product'].browse(set(active_ids) | set(active_kit_components))
+            }
+            stock_matrix = self._fetch_stock_matrix(active_ids, date_from, date_to, location_ids)
+            self._add_purchase_data(
+                monthly, product_indexes, month_indexes,
+                active_ids, date_from, date_to, active_kit_components, uom_factors
+            )
+            self._add_sale_data(
+                monthly, product_indexes, month_indexes,
+                active_ids, date_from, date_to, active_kit_components, uom_factors
+            )
+            self._add_pos_data(
+                monthly, product_indexes, month_indexes,
+                active_ids, date_from, date_to, active_kit_components
+            )
+
+        for product_index, product_id in enumerate(product_ids):
+            baseline_qty = stock_baseline.get(product_id, 0)
+
+            if product_id not in active_product_ids:
+                monthly[product_index, :, COL_OPENING] = baseline_qty
+                monthly[product_index, :, COL_CLOSING] = baseline_qty
+                continue
+
+            closing_qty = baseline_qty
+
+            for month_index, month in enumerate(months):
+                # Get opening and closing stock, carried over from the previous
+                # month when there was no stock move in this one
+                matrix_key = (product_id, month['year'], month['month'])
+                if matrix_key in stock_matrix:
+                    opening_delta, closing_delta = stock_matrix[matrix_key]
+                    opening_qty = baseline_qty + opening_delta
+                    closing_qty = baseline_qty + closing_delta
+                else:
+                    opening_qty = closing_qty
+
+                monthly[product_index, month_index, COL_OPENING] = opening_qty
+                monthly[product_index, month_index, COL_CLOSING] = closing_qty
+
+        # Sum yearly totals of the purchase, sale and POS columns over the months of each year.
+        # np.add.reduceat is faster than the numba kernel at report sizes, so the kernel is
+        # only used when explicitly enabled through a system parameter
+        year_values = monthly[:, :, COL_PURCHASE_QTY:COL_POS_VALUE + 1]
+        reduce_yearly = None
+        if self.env['ir.config_parameter'].sudo().get_param('nv_stock_movement_excel_report.use_numba'):
+            reduce_yearly = _get_reduce_yearly_kernel()
+
+        if reduce_yearly:
+            year_of_month = np.array(
+                [years_in_range.index(month['year']) for month in months], dtype=np.int64
+            )
+            yearly = reduce_yearly(np.ascontiguousarray(year_values), year_of_month, len(years_in_range))
+        else:
+            year_start_indexes = [
+                month_index for month_index, month in enumerate(months)
+                if month_index == 0 or month['year'] != months[month_index - 1]['year']
+            ]
+            yearly = np.add.reduceat(year_values, year_start_indexes, axis=1)
+
+        # Cell formats of a whole data row, in column order
+        month_fmts = [
+            formats['currency' if fmt_type == 'currency' else 'integer' if fmt_type == 'integer' else 'number']
+            for key, label, fmt_type in MONTH_COLUMNS
+        ]
+        year_fmts = [
+            formats['year_currency' if fmt_type == 'currency' else 'year_number']
+            for key, label, fmt_type in YEAR_COLUMNS
+        ]
+        row_fmts = month_fmts * len(months) + year_fmts * len(years_in_range)
 
         # Write product data
         data_row = 3
 
-        for product in products:
-            product_name = self._get_product_display_name(product)
-            worksheet.write(data_row, 0, product_name, formats['product'])
-
-            col = 1
-            yearly_totals = {year: {
-                'total_purchase_qty': 0,
-                'total_purchase_value': 0,
-                'total_sale_qty': 0,
-                'total_sale_value': 0,
-                'total_pos_qty': 0,
-                'total_pos_value': 0,
-            } for year in years_in_range}
-
-            for month in months:
-                # Get opening stock (stock at start of month)
-                opening_qty = self._get_stock_at_date(
-                    product.id,
-                    month['start'] - timedelta(days=1),
-                    location_ids
-                )
-
-                # Get movement data for the month
-                move_data = self._get_stock_moves_data(
-                    product.id,
-                    month['start'],
-                    month['end'],
-                    location_ids
-                )
-
-                # Get closing stock (stock at end of month)
-                closing_qty = self._get_stock_at_date(
-                    product.id,
-                    month['end'],
-                    location_ids
-                )
-
-                # Write monthly data
-                month_data = {
-                    'opening_qty': opening_qty,
-                    'purchase_qty': move_data['purchase_qty'],
-                    'purchase_value': move_data['purchase_value'],
-                    'sale_qty': move_data['sale_qty'],
-                    'sale_value': move_data['sale_value'],
-                    'pos_qty': move_data['pos_qty'],
-                    'pos_value': move_data['pos_value'],
-                    'closing_qty': closing_qty,
-                }
-
-                for col_def in month_columns:
-                    key, label, fmt_type = col_def
-                    value = month_data.get(key, 0)
-
-                    if fmt_type == 'currency':
-                        worksheet.write(data_row, col, value, formats['currency'])
-                    elif fmt_type == 'integer':
-                        worksheet.write(data_row, col, value, formats['integer'])
-                    else:
-                        worksheet.write(data_row, col, value, formats['number'])
-                    col += 1
-
-                # Accumulate yearly totals
-                year = month['year']
-                yearly_totals[year]['total_purchase_qty'] += move_data['purchase_qty']
-                yearly_totals[year]['total_purchase_value'] += move_data['purchase_value']
-                yearly_totals[year]['total_sale_qty'] += move_data['sale_qty']
-                yearly_totals[year]['total_sale_value'] += move_data['sale_value']
-                yearly_totals[year]['total_pos_qty'] += move_data['pos_qty']
-                yearly_totals[year]['total_pos_value'] += move_data['pos_value']
-
-            # Write yearly totals
-            for year in years_in_range:
-                for col_def in year_columns:
-                    key, label, fmt_type = col_def
-                    value = yearly_totals[year].get(key, 0)
-
-                    if fmt_type == 'currency':
-                        worksheet.write(data_row, col, value, formats['year_currency'])
-                    else:
-                        worksheet.write(data_row, col, value, formats['year_number'])
-                    col += 1
+        for product_index, product_id in enumerate(product_ids):
+            worksheet.write_string(data_row, 0, display_names[product_id], formats['product'])
+
+            values = monthly[product_index].ravel().tolist() + yearly[product_index].ravel().tolist()
+            for col, (value, fmt) in enumerate(zip(values, row_fmts), start=1):
+                worksheet.write_number(data_row, col, value, fmt)
 
             data_row += 1
 